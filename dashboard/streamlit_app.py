@@ -13,56 +13,117 @@ This is designed to mimic an internal risk analyst tool at a crypto exchange or
 """
 
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+import numpy as np
 import pandas as pd
 import streamlit as st
-import networkx as nx
-import matplotlib.pyplot as plt
+
+# networkx and matplotlib are imported inside the network helpers so the
+# KPI view does not pay their import cost on cold start.
+if TYPE_CHECKING:
+    import networkx as nx
 
 # ---------- Paths & Data Loading ----------
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = PROJECT_ROOT / "data"
 
+# dtype hints for the CSV fallback in load_data, so pandas skips type inference
+TX_CSV_DTYPES = {
+    "tx_id": "string",
+    "from_wallet": "category",
+    "to_wallet": "category",
+    "chain": "category",
+    "tx_type": "category",
+    "amount": "float32",
+    "is_fraud_pattern": "uint8",
+    "pattern_flags": "uint8",
+    "pattern_tags": "string",
+    "risk_score": "uint8",
+    "risk_bucket": "category",
+}
+WALLETS_CSV_DTYPES = {
+    "wallet_id": "string",
+    "wallet_age_days": "uint16",
+    "country": "category",
+    "is_exchange_linked": "uint8",
+}
+
 
 @st.cache_data
 def load_data():
     """
-    Load scored transactions and wallet metadata from CSV.
+    Load scored transactions and wallet metadata from Parquet.
+
+    Falls back to the CSV files written by earlier versions of the pipeline
+    when the Parquet files are not present.
 
     Returns:
     - tx: transaction-level DataFrame with risk_score and risk_bucket
     - wallets: wallet-level DataFrame
     - wallet_risk: aggregated wallet-level risk stats (joined with wallet metadata)
     """
-    tx_path = DATA_DIR / "transactions_scored.csv"
-    wallets_path = DATA_DIR / "wallets.csv"
+    tx_path = DATA_DIR / "transactions_scored.parquet"
+    wallets_path = DATA_DIR / "wallets.parquet"
+
+    if tx_path.exists():
+        tx = pd.read_parquet(tx_path)
+    else:
+        tx = pd.read_csv(
+            tx_path.with_suffix(".csv"),
+            engine="pyarrow",
+            parse_dates=["timestamp"],
+            dtype=TX_CSV_DTYPES,
+        )
 
-    tx = pd.read_csv(tx_path, parse_dates=["timestamp"])
-    wallets = pd.read_csv(wallets_path)
+    if wallets_path.exists():
+        wallets = pd.read_parquet(wallets_path)
+    else:
+        wallets = pd.read_csv(
+            wallets_path.with_suffix(".csv"),
+            engine="pyarrow",
+            dtype=WALLETS_CSV_DTYPES,
+        )
 
     # Ensure scored columns exist
     if "risk_score" not in tx.columns or "risk_bucket" not in tx.columns:
         raise ValueError(
-            "transactions_scored.csv is missing risk_score or risk_bucket. "
+            "Scored transactions are missing risk_score or risk_bucket. "
             "Run src/run_scoring.py first."
         )
 
-    # Some older CSVs may not have is_fraud_pattern; default to 0 if missing
+    # Some older files may not have is_fraud_pattern; default to 0 if missing
     if "is_fraud_pattern" not in tx.columns:
-        tx["is_fraud_pattern"] = 0
-
-    # Boolean for readability
-    tx["has_fraud_pattern"] = tx["is_fraud_pattern"].astype(bool)
+        tx["is_fraud_pattern"] = np.zeros(len(tx), dtype=np.uint8)
+
+    # Low-cardinality string columns as categoricals (integer codes under the hood)
+    tx_category_cols = ["chain", "tx_type", "risk_bucket"]
+    tx[tx_category_cols] = tx[tx_category_cols].astype("category")
+    wallets["country"] = wallets["country"].astype("category")
+
+    # Wallet IDs share one categorical dtype, so joins and isin compare integer codes.
+    # Categories cover every ID seen in either file, so a transaction whose wallet is
+    # missing from wallets is kept (with empty metadata) rather than cast to NaN.
+    wallet_ids = (
+        pd.Index(wallets["wallet_id"])
+        .append([pd.Index(tx["from_wallet"]), pd.Index(tx["to_wallet"])])
+        .unique()
+    )
+    wallet_dtype = pd.CategoricalDtype(categories=wallet_ids)
+    wallets["wallet_id"] = wallets["wallet_id"].astype(wallet_dtype)
+    tx["from_wallet"] = tx["from_wallet"].astype(wallet_dtype)
+    tx["to_wallet"] = tx["to_wallet"].astype(wallet_dtype)
 
     # ---- Build wallet-level risk view based on FROM wallet behavior ----
+    # Group on categorical codes; skip key sorting and unobserved categories
     wallet_group = (
-        tx.groupby("from_wallet")
+        tx.groupby("from_wallet", sort=False, observed=True)
         .agg(
-            tx_count=("tx_id", "count"),
+            tx_count=("tx_id", "size"),
             avg_risk_score=("risk_score", "mean"),
             max_risk_score=("risk_score", "max"),
-            fraud_tx_count=("has_fraud_pattern", "sum"),
+            fraud_tx_count=("is_fraud_pattern", "sum"),
         )
         .reset_index()
         .rename(columns={"from_wallet": "wallet_id"})
@@ -72,18 +133,12 @@ def load_data():
     wallets_short = wallets[["wallet_id", "wallet_age_days", "country", "is_exchange_linked"]]
     wallet_risk = wallet_group.merge(wallets_short, on="wallet_id", how="left")
 
-    # Bucket wallets by max risk score
-    def wallet_bucket(score: float) -> str:
-        if pd.isna(score):
-            return "UNKNOWN"
-        if score < 30:
-            return "LOW"
-        elif score < 60:
-            return "MEDIUM"
-        else:
-            return "HIGH"
-
-    wallet_risk["wallet_risk_bucket"] = wallet_risk["max_risk_score"].apply(wallet_bucket)
+    # Bucket wallets by max risk score (same thresholds as risk_rules, plus UNKNOWN for NaN)
+    max_scores = wallet_risk["max_risk_score"].to_numpy(dtype=float)
+    bucket_codes = np.where(np.isnan(max_scores), 3, np.digitize(max_scores, [30, 60]))
+    wallet_risk["wallet_risk_bucket"] = pd.Categorical.from_codes(
+        bucket_codes, categories=["LOW", "MEDIUM", "HIGH", "UNKNOWN"]
+    )
     wallet_risk["fraud_rate"] = wallet_risk["fraud_tx_count"] / wallet_risk["tx_count"]
 
     return tx, wallets, wallet_risk
@@ -91,34 +146,47 @@ def load_data():
 
 # ---------- Helper Functions ----------
 
-def filter_data(tx: pd.DataFrame, wallet_risk: pd.DataFrame,
-                chains, countries, wallet_buckets):
+@st.cache_resource(max_entries=32, ttl="10m")
+def filter_data(_tx: pd.DataFrame, _wallet_risk: pd.DataFrame,
+                chains: tuple, countries: tuple, wallet_buckets: tuple):
     """
     Apply sidebar filters to both transaction and wallet-level views.
 
     We filter at the wallet level (country, bucket), then restrict transactions
     to those whose from_wallet is in the allowed wallet set.
+
+    Cached per filter combination only: the underscore-prefixed frames come
+    from load_data and never change, so Streamlit skips hashing them. Pass
+    sorted tuples so equivalent selections share a cache entry.
+
+    cache_resource returns the same frames on every hit instead of unpickling
+    a copy, so callers must not mutate the returned frames (copy first).
     """
-    tx_filtered = tx.copy()
-    wallet_filtered = wallet_risk.copy()
+    tx, wallet_risk = _tx, _wallet_risk
 
-    # Chain filter (transaction-level)
-    if chains:
-        tx_filtered = tx_filtered[tx_filtered["chain"].isin(chains)]
+    # Wallet-level filters are fused into a single mask, then sliced once
+    wallet_mask = np.ones(len(wallet_risk), dtype=bool)
 
     # Country filter (wallet-level)
     if countries:
-        wallet_filtered = wallet_filtered[wallet_filtered["country"].isin(countries)]
+        wallet_mask &= wallet_risk["country"].isin(countries).to_numpy()
 
     # Risk bucket filter (wallet-level)
     if wallet_buckets:
-        wallet_filtered = wallet_filtered[
-            wallet_filtered["wallet_risk_bucket"].isin(wallet_buckets)
-        ]
+        wallet_mask &= wallet_risk["wallet_risk_bucket"].isin(wallet_buckets).to_numpy()
+
+    wallet_filtered = wallet_risk[wallet_mask]
 
     # Restrict transactions to wallets that passed wallet-level filters
-    allowed_wallets = wallet_filtered["wallet_id"].unique()
-    tx_filtered = tx_filtered[tx_filtered["from_wallet"].isin(allowed_wallets)]
+    # (both columns share the wallet categorical dtype, so this is a code lookup)
+    allowed_wallets = wallet_filtered["wallet_id"]
+    tx_mask = tx["from_wallet"].isin(allowed_wallets).to_numpy()
+
+    # Chain filter (transaction-level)
+    if chains:
+        tx_mask &= tx["chain"].isin(chains).to_numpy()
+
+    tx_filtered = tx[tx_mask]
 
     return tx_filtered, wallet_filtered
 
@@ -128,15 +196,14 @@ def compute_kpis(tx: pd.DataFrame, wallet_risk: pd.DataFrame):
     Compute top-line KPIs for the current filtered view.
     """
     total_tx = len(tx)
-    total_wallets = wallet_risk["wallet_id"].nunique()
+    # wallet_risk has exactly one row per wallet, so counts are plain lengths/sums
+    total_wallets = len(wallet_risk)
 
-    high_risk_wallets = wallet_risk[
-        wallet_risk["wallet_risk_bucket"] == "HIGH"
-    ]["wallet_id"].nunique()
+    high_risk_wallets = int((wallet_risk["wallet_risk_bucket"] == "HIGH").sum())
 
     fraud_pattern_rate = 0.0
     if total_tx > 0:
-        fraud_pattern_rate = tx["has_fraud_pattern"].sum() / total_tx
+        fraud_pattern_rate = tx["is_fraud_pattern"].to_numpy().sum() / total_tx
 
     avg_risk_score = tx["risk_score"].mean() if total_tx > 0 else 0.0
 
@@ -149,41 +216,107 @@ def compute_kpis(tx: pd.DataFrame, wallet_risk: pd.DataFrame):
     }
 
 
-def build_wallet_network(tx: pd.DataFrame, center_wallet: str, max_neighbors: int = 25):
+@st.cache_resource(max_entries=32, ttl="10m")
+def build_wallet_lookup(_tx: pd.DataFrame, _wallet_risk: pd.DataFrame,
+                        chains: tuple, countries: tuple, wallet_buckets: tuple) -> pd.DataFrame:
+    """
+    Index the filter_data wallet view by wallet_id so a selected wallet is a hash lookup.
+
+    Takes the same arguments and cache key as filter_data; the indexed frame
+    is shared and read-only.
+    """
+    _, wallet_filtered = filter_data(_tx, _wallet_risk, chains, countries, wallet_buckets)
+    return wallet_filtered.set_index("wallet_id")
+
+
+@st.cache_resource(max_entries=32, ttl="10m")
+def build_wallet_indices(_tx: pd.DataFrame, _wallet_risk: pd.DataFrame,
+                         chains: tuple, countries: tuple, wallet_buckets: tuple):
+    """
+    Map each wallet to the row positions where it appears as sender / receiver.
+
+    Returns (tx_filtered, from_index, to_index): the filter_data transactions
+    for these filters plus two dicts (wallet -> positions in tx_filtered), so a
+    wallet's transactions can be gathered without scanning the whole frame.
+
+    The filtered frame is fetched here rather than passed in, so the positions
+    always refer to the frame returned alongside them. Takes the same arguments
+    and cache key as filter_data; results are shared, read-only objects.
+    """
+    tx_filtered, _ = filter_data(_tx, _wallet_risk, chains, countries, wallet_buckets)
+    from_index = tx_filtered.groupby("from_wallet", sort=False, observed=True).indices
+    to_index = tx_filtered.groupby("to_wallet", sort=False, observed=True).indices
+    return tx_filtered, from_index, to_index
+
+
+def build_wallet_network(wallet_indices: tuple, center_wallet: str, max_neighbors: int = 25):
     """
     Build a simple NetworkX graph focused on a center wallet.
 
     - Nodes: wallets
     - Edges: transactions between wallets in the filtered data
     - Only includes edges touching the center_wallet and its direct neighbors.
+
+    wallet_indices is the (tx_filtered, from_index, to_index) triple from
+    build_wallet_indices.
     """
-    sub_tx = tx[
-        (tx["from_wallet"] == center_wallet) | (tx["to_wallet"] == center_wallet)
-    ].copy()
+    import networkx as nx
 
+    tx, from_index, to_index = wallet_indices
+    no_rows = np.empty(0, dtype=np.intp)
+    rows = np.union1d(
+        from_index.get(center_wallet, no_rows),
+        to_index.get(center_wallet, no_rows),
+    )
+    sub_tx = tx.take(rows)
+
+    # Keep only the most recent transactions (partial sort, no full sort needed)
     if len(sub_tx) > max_neighbors:
-        sub_tx = sub_tx.sort_values("timestamp", ascending=False).head(max_neighbors)
+        sub_tx = sub_tx.nlargest(max_neighbors, "timestamp")
+
+    G = nx.from_pandas_edgelist(
+        sub_tx,
+        source="from_wallet",
+        target="to_wallet",
+        edge_attr="risk_score",
+        create_using=nx.Graph,
+    )
 
-    G = nx.Graph()
+    return G
 
-    for _, row in sub_tx.iterrows():
-        fw = row["from_wallet"]
-        tw = row["to_wallet"]
-        G.add_edge(fw, tw, risk_score=row["risk_score"])
 
-    return G
+@st.cache_data(max_entries=64)
+def compute_network_layout(nodes: tuple, edges: tuple):
+    """
+    Spring layout positions for a wallet graph, keyed on its sorted node/edge sets.
+
+    Re-selecting a wallet whose neighborhood has not changed skips the
+    Fruchterman-Reingold iterations entirely.
+    """
+    import networkx as nx
+
+    G = nx.Graph()
+    G.add_nodes_from(nodes)
+    G.add_edges_from(edges)
+    return nx.spring_layout(G, seed=42)
 
 
-def draw_wallet_network(G: nx.Graph, center_wallet: str):
+def draw_wallet_network(G: "nx.Graph", center_wallet: str):
     """
     Render the NetworkX graph using matplotlib and display it in Streamlit.
     """
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
     if G.number_of_nodes() == 0:
         st.info("No network connections to display for this wallet in the current view.")
         return
 
     plt.figure(figsize=(6, 4))
-    pos = nx.spring_layout(G, seed=42)
+    pos = compute_network_layout(
+        tuple(sorted(G.nodes)),
+        tuple(sorted(tuple(sorted(edge)) for edge in G.edges)),
+    )
 
     # All nodes
     nx.draw_networkx_nodes(G, pos, node_size=300, alpha=0.8)
@@ -250,10 +383,13 @@ def main():
         default=all_buckets,
     )
 
-    # Apply filters
-    tx_filtered, wallet_filtered = filter_data(
-        tx, wallet_risk, selected_chains, selected_countries, selected_buckets
+    # Apply filters (sorted tuples give a hashable, order-independent cache key)
+    filter_key = (
+        tuple(sorted(selected_chains)),
+        tuple(sorted(selected_countries)),
+        tuple(sorted(selected_buckets)),
     )
+    tx_filtered, wallet_filtered = filter_data(tx, wallet_risk, *filter_key)
 
     # ----- KPIs -----
     kpis = compute_kpis(tx_filtered, wallet_filtered)
@@ -269,6 +405,14 @@ def main():
 
     st.markdown("---")
 
+    # Top 50 wallets by max risk score: shown in the table and offered in the wallet picker.
+    # Ties (many wallets share a max score) are broken by wallet_id so the default is stable.
+    top_wallets = (
+        wallet_filtered.sort_values(["max_risk_score", "wallet_id"], ascending=[False, True])
+        .head(50)
+        .copy()
+    )
+
     # ----- Layout: left = wallet table, right = details + network -----
     left_col, right_col = st.columns([1.2, 1])
 
@@ -276,12 +420,6 @@ def main():
         st.subheader("High-risk wallets")
 
         if not wallet_filtered.empty:
-            top_wallets = (
-                wallet_filtered.sort_values("max_risk_score", ascending=False)
-                .head(50)
-                .copy()
-            )
-
             display_cols = [
                 "wallet_id",
                 "wallet_risk_bucket",
@@ -307,30 +445,31 @@ def main():
         st.subheader("Wallet details and network")
 
         if not wallet_filtered.empty:
-            wallet_choices = wallet_filtered["wallet_id"].sort_values().unique().tolist()
+            # Keep the option list short; a selectbox with thousands of options renders slowly
+            wallet_choices = top_wallets["wallet_id"].tolist()
             selected_wallet = st.selectbox(
                 "Select wallet",
                 options=wallet_choices,
             )
 
-            selected_stats = wallet_filtered[wallet_filtered["wallet_id"] == selected_wallet]
-            if not selected_stats.empty:
-                row = selected_stats.iloc[0]
-                st.markdown(f"**Wallet ID:** `{row['wallet_id']}`")
-                st.markdown(f"**Wallet risk bucket:** {row['wallet_risk_bucket']}")
-                st.markdown(f"**Max risk score:** {row['max_risk_score']:.1f}")
-                st.markdown(f"**Transactions:** {int(row['tx_count'])}")
-                st.markdown(f"**Fraud transactions:** {int(row['fraud_tx_count'])}")
-                st.markdown(f"**Fraud rate:** {row['fraud_rate']*100:.1f}%")
-                st.markdown(f"**Wallet age (days):** {int(row['wallet_age_days'])}")
-                st.markdown(f"**Country:** {row['country']}")
-                st.markdown(
-                    f"**Exchange linked:** {'Yes' if row['is_exchange_linked'] == 1 else 'No'}"
-                )
+            # Options come from wallet_filtered, so the selected wallet is always present
+            row = build_wallet_lookup(tx, wallet_risk, *filter_key).loc[selected_wallet]
+            st.markdown(f"**Wallet ID:** `{selected_wallet}`")
+            st.markdown(f"**Wallet risk bucket:** {row['wallet_risk_bucket']}")
+            st.markdown(f"**Max risk score:** {row['max_risk_score']:.1f}")
+            st.markdown(f"**Transactions:** {int(row['tx_count'])}")
+            st.markdown(f"**Fraud transactions:** {int(row['fraud_tx_count'])}")
+            st.markdown(f"**Fraud rate:** {row['fraud_rate']*100:.1f}%")
+            st.markdown(f"**Wallet age (days):** {int(row['wallet_age_days'])}")
+            st.markdown(f"**Country:** {row['country']}")
+            st.markdown(
+                f"**Exchange linked:** {'Yes' if row['is_exchange_linked'] == 1 else 'No'}"
+            )
 
             st.markdown("### Wallet network view")
 
-            G = build_wallet_network(tx_filtered, selected_wallet)
+            wallet_indices = build_wallet_indices(tx, wallet_risk, *filter_key)
+            G = build_wallet_network(wallet_indices, selected_wallet)
             draw_wallet_network(G, selected_wallet)
         else:
             st.info("No wallet details to display with the current filters.")
@@ -5,8 +5,8 @@ Generates synthetic crypto wallets and transactions.
 This is the foundation for the Crypto Transaction Risk Simulator.
 
 Outputs:
-- data/wallets.csv
-- data/transactions.csv
+- data/wallets.parquet
+- data/transactions.parquet
 """
 
 from pathlib import Path
@@ -14,6 +14,13 @@ import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
+from risk_rules import (
+    PATTERN_HIGH_RISK_COUNTERPARTY,
+    PATTERN_MIXING_LIKE_OUTBOUND,
+    PATTERN_NEW_WALLET_LARGE_OUTBOUND,
+    PATTERN_TAGS,
+)
+
 # Set a random seed so results are reproducible
 np.random.seed(42)
 
@@ -23,6 +30,20 @@ DATA_DIR = PROJECT_ROOT / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
 
+def draw_categorical(categories: list, p: list, size: int) -> pd.Categorical:
+    """
+    Sample a categorical column as compact int8 codes.
+
+    Uses the same inverse-CDF draw as np.random.choice (one uniform sample
+    per row + searchsorted), so results match for a given seed, but the
+    column is built from integer codes rather than an array of strings.
+    """
+    cdf = np.cumsum(p)
+    cdf /= cdf[-1]
+    codes = cdf.searchsorted(np.random.random_sample(size), side="right").astype(np.int8)
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
 def generate_wallets(n_wallets: int = 2000) -> pd.DataFrame:
     """
     Create a synthetic set of crypto wallets.
@@ -34,15 +55,15 @@ def generate_wallets(n_wallets: int = 2000) -> pd.DataFrame:
     - is_exchange_linked: whether this wallet is linked to an exchange
     """
 
-    wallet_ids = [f"WALLET_{i:05d}" for i in range(1, n_wallets + 1)]
+    wallet_ids = np.char.add("WALLET_", np.char.zfill(np.arange(1, n_wallets + 1).astype(str), 5))
 
     # Wallet age between 0 and 720 days (0 means very new)
-    wallet_age_days = np.random.randint(0, 720, size=n_wallets)
+    wallet_age_days = np.random.randint(0, 720, size=n_wallets).astype(np.uint16)
 
-    countries = np.random.choice(
+    countries = draw_categorical(
         ["US", "GB", "BR", "DE", "NG", "IN", "SG", "CA"],
-        size=n_wallets,
         p=[0.25, 0.1, 0.1, 0.08, 0.08, 0.15, 0.12, 0.12],
+        size=n_wallets,
     )
 
     # Most wallets are not directly tied to an exchange
@@ -50,7 +71,7 @@ def generate_wallets(n_wallets: int = 2000) -> pd.DataFrame:
         [0, 1],
         size=n_wallets,
         p=[0.8, 0.2],
-    )
+    ).astype(np.uint8)
 
     wallets = pd.DataFrame(
         {
@@ -101,19 +122,21 @@ def generate_transactions(wallets: pd.DataFrame, n_transactions: int = 30000) ->
     # Uniformly sample seconds in this window
     seconds_span = int((end_time - start_time).total_seconds())
     random_seconds = np.random.randint(0, seconds_span, size=n_transactions)
-    timestamps = [start_time + timedelta(seconds=int(s)) for s in random_seconds]
+    # Vectorized datetime64 arithmetic instead of building Python datetime objects
+    start = np.datetime64(start_time.replace(microsecond=0), "s")
+    timestamps = start + random_seconds.astype("timedelta64[s]")
 
     # Chains and transaction types
-    chains = np.random.choice(
+    chains = draw_categorical(
         ["BTC", "ETH", "USDC"],
-        size=n_transactions,
         p=[0.3, 0.4, 0.3],
+        size=n_transactions,
     )
 
-    tx_types = np.random.choice(
+    tx_types = draw_categorical(
         ["transfer", "swap", "contract_interaction"],
-        size=n_transactions,
         p=[0.7, 0.2, 0.1],
+        size=n_transactions,
     )
 
     # Amounts: log-normal like distribution to simulate heavy tails
@@ -121,7 +144,7 @@ def generate_transactions(wallets: pd.DataFrame, n_transactions: int = 30000) ->
     # Make some very small and some very large transactions
     amounts = np.round(base_amounts, 2)
 
-    tx_ids = [f"TX_{i:06d}" for i in range(1, n_transactions + 1)]
+    tx_ids = np.char.add("TX_", np.char.zfill(np.arange(1, n_transactions + 1).astype(str), 6))
 
     tx = pd.DataFrame(
         {
@@ -147,7 +170,8 @@ def inject_fraud_patterns(wallets: pd.DataFrame, tx: pd.DataFrame) -> pd.DataFra
 
     We add:
     - is_fraud_pattern: 1 if the transaction is part of a known synthetic pattern, else 0
-    - pattern_tags: free-text field describing which pattern(s) were applied
+    - pattern_flags: bitmask of the pattern(s) applied (see the PATTERN_* bits in risk_rules)
+    - pattern_tags: readable form of pattern_flags (e.g. ";mixing_like_outbound;high_risk_counterparty")
 
     Patterns we simulate:
     - New wallet abuse: very new wallets sending large outbound transfers
@@ -156,37 +180,23 @@ def inject_fraud_patterns(wallets: pd.DataFrame, tx: pd.DataFrame) -> pd.DataFra
     """
 
     tx = tx.copy()
-    tx["is_fraud_pattern"] = 0
-    tx["pattern_tags"] = ""
-
-    # Merge wallet features into transactions for easier labeling
-    wallets_short = wallets[["wallet_id", "wallet_age_days", "country", "is_exchange_linked"]]
-    tx = tx.merge(
-        wallets_short.add_prefix("from_"),
-        left_on="from_wallet",
-        right_on="from_wallet_id",
-        how="left",
-    )
-    tx = tx.merge(
-        wallets_short.add_prefix("to_"),
-        left_on="to_wallet",
-        right_on="to_wallet_id",
-        how="left",
-    )
+    tx["is_fraud_pattern"] = np.zeros(len(tx), dtype=np.uint8)
+    tx["pattern_flags"] = np.zeros(len(tx), dtype=np.uint8)
 
     # Pattern 1: New wallet abuse (very young wallets sending big amounts)
     young_threshold_days = 7
     large_amount_threshold = 500.0
 
-    mask_new_wallet_abuse = (
-        (tx["from_wallet_age_days"] <= young_threshold_days)
-        & (tx["amount"] >= large_amount_threshold)
+    # Look up the sender's age directly instead of merging wallet features into tx
+    age_by_wallet = wallets.set_index("wallet_id")["wallet_age_days"]
+    from_age = tx["from_wallet"].map(age_by_wallet).to_numpy()
+
+    mask_new_wallet_abuse = (from_age <= young_threshold_days) & (
+        tx["amount"].to_numpy() >= large_amount_threshold
     )
 
     tx.loc[mask_new_wallet_abuse, "is_fraud_pattern"] = 1
-    tx.loc[mask_new_wallet_abuse, "pattern_tags"] = tx.loc[
-        mask_new_wallet_abuse, "pattern_tags"
-    ].astype(str) + ";new_wallet_large_outbound"
+    tx.loc[mask_new_wallet_abuse, "pattern_flags"] |= PATTERN_NEW_WALLET_LARGE_OUTBOUND
 
     # Pattern 2: Mixing-like behavior
     # For wallets that receive many small inbound payments then send a big outbound one
@@ -199,14 +209,12 @@ def inject_fraud_patterns(wallets: pd.DataFrame, tx: pd.DataFrame) -> pd.DataFra
     potential_mixers = small_inbound[small_inbound >= 10].index  # 10 or more small credits
 
     # For those potential mixer wallets, flag the largest outbound transaction as fraud pattern
-    for w in potential_mixers:
-        outbound_mask = tx["from_wallet"] == w
-        if outbound_mask.sum() == 0:
-            continue
-        # pick the largest outbound
-        idx = tx.loc[outbound_mask, "amount"].idxmax()
-        tx.loc[idx, "is_fraud_pattern"] = 1
-        tx.loc[idx, "pattern_tags"] = str(tx.loc[idx, "pattern_tags"]) + ";mixing_like_outbound"
+    # (one grouped idxmax; mixers with no outbound transactions simply have no group)
+    outbound = tx[tx["from_wallet"].isin(potential_mixers)]
+    idx_mixing = outbound.groupby("from_wallet", sort=False)["amount"].idxmax().to_numpy()
+
+    tx.loc[idx_mixing, "is_fraud_pattern"] = 1
+    tx.loc[idx_mixing, "pattern_flags"] |= PATTERN_MIXING_LIKE_OUTBOUND
 
     # Pattern 3: High-risk counterparties
     # Choose a few wallets as "known bad" and flag any transaction that interacts with them
@@ -218,16 +226,16 @@ def inject_fraud_patterns(wallets: pd.DataFrame, tx: pd.DataFrame) -> pd.DataFra
     ].isin(high_risk_wallets)
 
     tx.loc[mask_high_risk_counterparty, "is_fraud_pattern"] = 1
-    tx.loc[mask_high_risk_counterparty, "pattern_tags"] = tx.loc[
-        mask_high_risk_counterparty, "pattern_tags"
-    ].astype(str) + ";high_risk_counterparty"
-
-    # Clean up helper merge columns we do not want in the final CSV
-    drop_cols = [
-        "from_wallet_id",
-        "to_wallet_id",
+    tx.loc[mask_high_risk_counterparty, "pattern_flags"] |= PATTERN_HIGH_RISK_COUNTERPARTY
+
+    # Derive readable tags once from the bitmask: one interned string per flag combination
+    tag_combos = [
+        "".join(f";{tag}" for bit, tag in PATTERN_TAGS.items() if flags & bit)
+        for flags in range(2 ** len(PATTERN_TAGS))
     ]
-    tx = tx.drop(columns=drop_cols)
+    tx["pattern_tags"] = pd.Categorical.from_codes(
+        tx["pattern_flags"].to_numpy(), categories=tag_combos
+    )
 
     return tx
 
@@ -238,13 +246,13 @@ def main():
     - build wallets
     - build transactions
     - inject patterns
-    - save to CSV
+    - save to Parquet
     """
 
     print("Generating wallets...")
     wallets = generate_wallets()
-    wallets_path = DATA_DIR / "wallets.csv"
-    wallets.to_csv(wallets_path, index=False)
+    wallets_path = DATA_DIR / "wallets.parquet"
+    wallets.to_parquet(wallets_path, compression="zstd", index=False)
     print(f"Saved wallets to {wallets_path}")
 
     print("Generating transactions...")
@@ -254,8 +262,8 @@ def main():
     print("Injecting fraud patterns...")
     tx_with_patterns = inject_fraud_patterns(wallets, tx)
 
-    tx_path = DATA_DIR / "transactions.csv"
-    tx_with_patterns.to_csv(tx_path, index=False)
+    tx_path = DATA_DIR / "transactions.parquet"
+    tx_with_patterns.to_parquet(tx_path, compression="zstd", index=False)
     print(f"Saved transactions with patterns to {tx_path}")
 
 
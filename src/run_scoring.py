@@ -5,7 +5,7 @@ Loads synthetic transactions, applies risk rules,
 and saves a scored dataset.
 
 Outputs:
-- data/transactions_scored.csv
+- data/transactions_scored.parquet
 """
 
 from pathlib import Path
@@ -18,20 +18,20 @@ DATA_DIR = PROJECT_ROOT / "data"
 
 
 def main():
-    tx_path = DATA_DIR / "transactions.csv"
+    tx_path = DATA_DIR / "transactions.parquet"
     if not tx_path.exists():
         raise FileNotFoundError(
             f"{tx_path} not found. Run generate_data.py first to create synthetic transactions."
         )
 
     print(f"Loading transactions from {tx_path}...")
-    tx = pd.read_csv(tx_path, parse_dates=["timestamp"])
+    tx = pd.read_parquet(tx_path)
 
     print("Applying risk rules...")
     tx_scored = apply_risk_rules(tx)
 
-    output_path = DATA_DIR / "transactions_scored.csv"
-    tx_scored.to_csv(output_path, index=False)
+    output_path = DATA_DIR / "transactions_scored.parquet"
+    tx_scored.to_parquet(output_path, compression="zstd", index=False)
     print(f"Saved scored transactions to {output_path}")
 
 